@@ -3,8 +3,16 @@ import zipfile
 import threading
 import time
 import json
+import re
+import hashlib
+import zlib
+import stat
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from flask import Flask, request, render_template_string, redirect
+from functools import lru_cache
+from flask import Flask, request, render_template_string, redirect, jsonify
 import shutil
 import schedule
 import requests
@@ -21,6 +29,14 @@ logging.basicConfig(
 app = Flask(__name__)
 
 CONFIG_FILE = 'backup_config.json'
+API_PREFIX = '/api/v1'
+SOLID_DIR = '__solid__'
+SOLID_COMPRESSION = {'deflate': zipfile.ZIP_DEFLATED, 'lzma': zipfile.ZIP_LZMA}
+DELTA_DIR = '__delta__'
+SIGNATURE_DIR = '.backup_signatures'
+MAX_DELTA_DEPTH = 100  # most deltas stacked on a full copy; delta_max_chain is clamped to it
+ARCHIVE_SYNC_BYTES = 64 * 1024 * 1024  # how much compressed archive data may sit in the page cache while streaming
+STATS_CACHE_SECONDS = 60
 
 def load_config():
     if os.path.exists(CONFIG_FILE):
@@ -34,6 +50,32 @@ def load_config():
                 data['scheduler_enabled'] = True
             if 'retention_count' not in data:
                 data['retention_count'] = 0  # 0 means keep all backups
+            if 'prefetch_depth' not in data:
+                data['prefetch_depth'] = 16  # 0 means read files one at a time
+            if 'prefetch_max_file_kb' not in data:
+                data['prefetch_max_file_kb'] = 1024
+            if 'exclude_rules' not in data:
+                data['exclude_rules'] = []
+            if 'solid_mode' not in data:
+                data['solid_mode'] = False
+            if 'solid_block_mb' not in data:
+                data['solid_block_mb'] = 16
+            if 'solid_max_file_kb' not in data:
+                data['solid_max_file_kb'] = 64
+            if 'solid_compression' not in data:
+                data['solid_compression'] = 'deflate'
+            if 'delta_mode' not in data:
+                data['delta_mode'] = False
+            if 'delta_min_mb' not in data:
+                data['delta_min_mb'] = 256
+            if 'delta_block_kb' not in data:
+                data['delta_block_kb'] = 1024
+            if 'delta_max_chain' not in data:
+                data['delta_max_chain'] = 7
+            if 'large_file_mb' not in data:
+                data['large_file_mb'] = 64
+            if 'large_file_buffer_mb' not in data:
+                data['large_file_buffer_mb'] = 8
             if 'ui_state' not in data:
                 data['ui_state'] = {
                     'history_collapsed': 'false',
@@ -51,6 +93,19 @@ def load_config():
         'webhook_url': '',
         'scheduler_enabled': True,
         'retention_count': 0,  # 0 means keep all backups
+        'prefetch_depth': 16,  # 0 means read files one at a time
+        'prefetch_max_file_kb': 1024,
+        'exclude_rules': [],
+        'solid_mode': False,
+        'solid_block_mb': 16,
+        'solid_max_file_kb': 64,
+        'solid_compression': 'deflate',
+        'delta_mode': False,
+        'delta_min_mb': 256,
+        'delta_block_kb': 1024,
+        'delta_max_chain': 7,
+        'large_file_mb': 64,
+        'large_file_buffer_mb': 8,
         'history': [],
         'stats': {
             'run_count': 0,
@@ -211,15 +266,64 @@ html_template = '''
     <label>Number of Backups to Keep (0 = keep all):</label>
     <input type="number" name="retention_count" min="0" value="{{ config['retention_count'] }}">
 
+    <label>Read-ahead Depth (files read concurrently, 0 = off):</label>
+    <input type="number" name="prefetch_depth" min="0" value="{{ config['prefetch_depth'] }}">
+
+    <label>Read-ahead Max File Size (KB):</label>
+    <input type="number" name="prefetch_max_file_kb" min="0" value="{{ config['prefetch_max_file_kb'] }}">
+
+    <label>Solid Mode (pack small files into shared compressed blocks):</label>
+    <select name="solid_mode">
+        <option value="false" {{ '' if config['solid_mode'] else 'selected' }}>Off</option>
+        <option value="true" {{ 'selected' if config['solid_mode'] else '' }}>On</option>
+    </select>
+
+    <label>Solid Block Size (MB):</label>
+    <input type="number" name="solid_block_mb" min="1" value="{{ config['solid_block_mb'] }}">
+
+    <label>Solid Max File Size (KB, larger files are stored individually):</label>
+    <input type="number" name="solid_max_file_kb" min="1" value="{{ config['solid_max_file_kb'] }}">
+
+    <label>Solid Block Compression:</label>
+    <select name="solid_compression">
+        <option value="deflate" {{ 'selected' if config['solid_compression'] == 'deflate' else '' }}>Deflate (fast)</option>
+        <option value="lzma" {{ 'selected' if config['solid_compression'] == 'lzma' else '' }}>LZMA (smaller, slower)</option>
+    </select>
+
+    <label>Delta Mode (store only changed blocks of large files):</label>
+    <select name="delta_mode">
+        <option value="false" {{ '' if config['delta_mode'] else 'selected' }}>Off</option>
+        <option value="true" {{ 'selected' if config['delta_mode'] else '' }}>On</option>
+    </select>
+
+    <label>Delta Min File Size (MB):</label>
+    <input type="number" name="delta_min_mb" min="1" value="{{ config['delta_min_mb'] }}">
+
+    <label>Delta Block Size (KB):</label>
+    <input type="number" name="delta_block_kb" min="4" value="{{ config['delta_block_kb'] }}">
+
+    <label>Delta Max Chain Length (full copy after this many deltas):</label>
+    <input type="number" name="delta_max_chain" min="1" max="100" value="{{ config['delta_max_chain'] }}">
+
+    <label>Large File Threshold (MB, streamed without polluting the page cache):</label>
+    <input type="number" name="large_file_mb" min="1" value="{{ config['large_file_mb'] }}">
+
+    <label>Large File Buffer Size (MB):</label>
+    <input type="number" name="large_file_buffer_mb" min="1" value="{{ config['large_file_buffer_mb'] }}">
+
 </div>
 
 <div class="section">
-    <label>Files to Backup (format: path | label):</label>
-    <textarea name="files" rows="5">{% for f in config['files'] %}{{ f['path'] }} | {{ f['label'] }}
+    <label>Files to Backup (format: path | label | optional rules separated by ;):</label>
+    <textarea name="files" rows="5">{% for f in config['files'] %}{{ f['path'] }} | {{ f['label'] }}{% if f.get('rules') %} | {{ f['rules']|join('; ') }}{% endif %}
 {% endfor %}</textarea>
 
-    <label>Folders to Backup (format: path | label):</label>
-    <textarea name="folders" rows="5">{% for f in config['folders'] %}{{ f['path'] }} | {{ f['label'] }}
+    <label>Folders to Backup (format: path | label | optional rules separated by ;):</label>
+    <textarea name="folders" rows="5">{% for f in config['folders'] %}{{ f['path'] }} | {{ f['label'] }}{% if f.get('rules') %} | {{ f['rules']|join('; ') }}{% endif %}
+{% endfor %}</textarea>
+
+    <label>Include/Exclude Rules for all entries (one per line: glob, !glob to include, re:regex, size&gt;100M, age&gt;30d):</label>
+    <textarea name="exclude_rules" rows="5" placeholder="node_modules/&#10;__pycache__/&#10;.git/&#10;*.log">{% for rule in config['exclude_rules'] %}{{ rule }}
 {% endfor %}</textarea>
 </div>
 
@@ -253,11 +357,7 @@ html_template = '''
         <i class="fas fa-chevron-down"></i> Backup History
     </h2>
     <div class="section-content {{ 'collapsed' if config.get('ui_state', {}).get('history_collapsed', 'false') == 'true' else '' }}">
-        {% for entry in config['history'] %}
-        <div class="backup-entry">
-            {{ entry }}
-        </div>
-        {% endfor %}
+        <div id="history-list"></div>
     </div>
 </div>
 
@@ -270,13 +370,13 @@ html_template = '''
         <h3>Folders</h3>
         <ul>
         {% for folder in config['folders'] %}
-            <li>{{ folder['label'] }} ({{ folder['path'] }})</li>
+            <li>{{ folder['label'] }} ({{ folder['path'] }}){% if folder.get('rules') %} - rules: {{ folder['rules']|join('; ') }}{% endif %}</li>
         {% endfor %}
         </ul>
         <h3>Files</h3>
         <ul>
         {% for file in config['files'] %}
-            <li>{{ file['label'] }} ({{ file['path'] }})</li>
+            <li>{{ file['label'] }} ({{ file['path'] }}){% if file.get('rules') %} - rules: {{ file['rules']|join('; ') }}{% endif %}</li>
         {% endfor %}
         </ul>
     </div>
@@ -288,11 +388,21 @@ html_template = '''
         <i class="fas fa-chevron-down"></i> Contents of Destination Folder
     </h2>
     <div class="section-content {{ 'collapsed' if config.get('ui_state', {}).get('destination_collapsed', 'false') == 'true' else '' }}">
-        <ul>
-        {% for file in destination_files %}
-            <li>{{ file }}</li>
-        {% endfor %}
-        </ul>
+        <div style="display: flex; gap: 10px; align-items: center;">
+            <select id="destination-sort" style="width: auto;">
+                <option value="mtime">Sort by date</option>
+                <option value="name">Sort by name</option>
+                <option value="size">Sort by size</option>
+            </select>
+            <select id="destination-order" style="width: auto;">
+                <option value="desc">Descending</option>
+                <option value="asc">Ascending</option>
+            </select>
+            <button type="button" id="destination-prev" style="margin-top: 0;"><i class="fas fa-chevron-left"></i></button>
+            <span id="destination-page"></span>
+            <button type="button" id="destination-next" style="margin-top: 0;"><i class="fas fa-chevron-right"></i></button>
+        </div>
+        <ul id="destination-list"></ul>
     </div>
 </div>
 
@@ -302,14 +412,9 @@ html_template = '''
         <i class="fas fa-chevron-down"></i> Backup Stats
     </h2>
     <div class="section-content {{ 'collapsed' if config.get('ui_state', {}).get('stats_collapsed', 'false') == 'true' else '' }}">
-        <ul>
-            <li>Total files to backup: {{ stats['file_count'] }}</li>
-            <li>Total folders to backup: {{ stats['folder_count'] }}</li>
-            <li>Total size to backup: {{ stats['total_size'] }} MB</li>
-            <li>Total backups run: {{ config['stats']['run_count'] }}</li>
-            <li>Last backup: {{ config['stats']['last_backup'] }}</li>
-            <li>Next backup: {{ config['stats']['next_backup'] }}</li>
-        </ul>
+        <ul id="stats-list"></ul>
+        <h3 id="rule-skips-header" style="display: none;">Skipped by rules (last backup)</h3>
+        <ul id="rule-skips-list"></ul>
     </div>
 </div>
 
@@ -337,12 +442,779 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         });
     });
+
+    loadHistory();
+    loadStats();
+    loadDestination();
+
+    document.getElementById('destination-sort').addEventListener('change', () => { destinationPage = 1; loadDestination(); });
+    document.getElementById('destination-order').addEventListener('change', () => { destinationPage = 1; loadDestination(); });
+    document.getElementById('destination-prev').addEventListener('click', () => { destinationPage--; loadDestination(); });
+    document.getElementById('destination-next').addEventListener('click', () => { destinationPage++; loadDestination(); });
 });
+
+// The sections below are filled from the JSON API. 'no-cache' makes the browser
+// revalidate with If-None-Match, so unchanged data comes back as a bodiless 304.
+let destinationPage = 1;
+
+async function getJSON(url) {
+    const response = await fetch(url, { cache: 'no-cache' });
+    if (!response.ok) {
+        throw new Error(url + ' returned ' + response.status);
+    }
+    return response.json();
+}
+
+function fillList(id, lines, tag = 'li', className = '') {
+    const list = document.getElementById(id);
+    list.replaceChildren(...lines.map(line => {
+        const item = document.createElement(tag);
+        item.textContent = line;
+        if (className) {
+            item.className = className;
+        }
+        return item;
+    }));
+}
+
+async function loadHistory() {
+    const data = await getJSON('/api/v1/runs?per_page=100');
+    fillList('history-list', data.items, 'div', 'backup-entry');
+}
+
+async function loadStats() {
+    const data = await getJSON('/api/v1/stats');
+    fillList('stats-list', [
+        'Total files to backup: ' + data.source.file_count,
+        'Total folders to backup: ' + data.source.folder_count,
+        'Total size to backup: ' + data.source.total_size + ' MB',
+        'Total backups run: ' + data.backups.run_count,
+        'Last backup: ' + data.backups.last_backup,
+        'Next backup: ' + data.backups.next_backup
+    ]);
+    const run = data.backups.last_run;
+    if (run) {
+        const lines = [
+            `Last run (${run.mode}): ${run.files} files, ratio ${run.ratio}, ${run.files_per_second} files/s, ${run.mb_per_second} MB/s`
+        ];
+        if (run.large_files) {
+            lines.push(`Large files streamed: ${run.large_files} (${run.large_mb} MB)`);
+        }
+        if (run.page_cache_left_mb !== undefined) {
+            lines.push(`Page cache: at most ${run.page_cache_left_mb} MB left cached by this run, ${run.page_cache_dropped_mb} MB dropped`);
+        }
+        if (run.mode === 'solid') {
+            lines.push(`Solid: ${run.solid_files} small files in ${run.solid_blocks} blocks, block ratio ${run.solid_ratio}`);
+            if (run.speed_gain) {
+                lines.push(`Compared with last standard run: ${run.speed_gain}x speed, ${run.ratio_gain}x ratio`);
+            }
+        }
+        document.getElementById('stats-list').append(...lines.map(line => {
+            const item = document.createElement('li');
+            item.textContent = line;
+            return item;
+        }));
+    }
+    const ruleSkips = data.backups.rule_skips || [];
+    document.getElementById('rule-skips-header').style.display = ruleSkips.length ? '' : 'none';
+    fillList('rule-skips-list', ruleSkips);
+}
+
+async function loadDestination() {
+    const sort = document.getElementById('destination-sort').value;
+    const order = document.getElementById('destination-order').value;
+    const data = await getJSON(`/api/v1/destination?page=${destinationPage}&sort=${sort}&order=${order}`);
+    destinationPage = data.page;
+    fillList('destination-list', data.items.map(item =>
+        item.is_dir ? `${item.name}/ - ${item.mtime}` : `${item.name} - ${(item.size / (1024 * 1024)).toFixed(2)} MB - ${item.mtime}`));
+    document.getElementById('destination-page').textContent = `Page ${data.page} of ${data.pages} (${data.total} items)`;
+    document.getElementById('destination-prev').disabled = data.page <= 1;
+    document.getElementById('destination-next').disabled = data.page >= data.pages;
+}
 </script>
 </body>
 </html>
 '''
 
+SIZE_UNITS = {'': 1, 'B': 1, 'K': 1024, 'KB': 1024, 'M': 1024 ** 2, 'MB': 1024 ** 2, 'G': 1024 ** 3, 'GB': 1024 ** 3}
+AGE_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+def glob_to_regex(pattern):
+    """Translate a gitignore-style glob (already stripped of '!' and trailing '/') to a regex"""
+    # A pattern with a slash in it is relative to the root, otherwise it matches at any depth
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+            continue
+        if c == '*':
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[' and ']' in pattern[i + 2:]:
+            j = pattern.index(']', i + 2)
+            body = pattern[i + 1:j]
+            negate = body[0] in '!^'
+            if negate:
+                body = body[1:]
+            out.append('[' + ('^' if negate else '') + body.replace('\\', '\\\\') + ']')
+            i = j
+        elif c == '\\' and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 1
+        else:
+            out.append(re.escape(c))
+        i += 1
+    regex = ''.join(out)
+    return regex if anchored else '(?:.*/)?' + regex
+
+@lru_cache(maxsize=64)
+def compile_rules(rule_lines):
+    """
+    Compile include/exclude rules into one matcher. Rules are gitignore-style:
+      node_modules/     exclude (a trailing / only matches folders)
+      !keep.log         include again
+      re:\\.tmp$        exclude by regex on the path relative to the root (no
+                        named groups or backreferences, since rules are combined)
+      size>100M         exclude files larger than 100 MB (K, M, G)
+      age>30d           exclude files not modified for 30 days (s, m, h, d, w; lower case)
+    For path rules the last matching one wins. All path rules are folded into a single
+    regex per kind (file/folder), so each path is tested with one fullmatch call.
+    Raises ValueError on a bad rule.
+    """
+    path_rules = []
+    limits = []
+    for line in rule_lines:
+        text = line.strip()
+        if not text or text.startswith('#'):
+            continue
+
+        limit = re.fullmatch(r'(size|age)\s*>\s*(\d+(?:\.\d+)?)\s*([A-Za-z]*)', text)
+        if limit:
+            kind, value, unit = limit.groups()
+            units = SIZE_UNITS if kind == 'size' else AGE_UNITS
+            # Age units are case-sensitive: 'M' could mean months and must not become minutes
+            key = unit.upper() if kind == 'size' else unit
+            if key not in units:
+                raise ValueError(f"Unknown unit '{unit}' in rule: {text} (age units are s, m, h, d, w)"
+                                 if kind == 'age' else f"Unknown unit '{unit}' in rule: {text}")
+            limits.append((kind, float(value) * units[key], text))
+            continue
+
+        include = text.startswith('!')
+        pattern = text[1:] if include else text
+        if pattern.startswith('re:'):
+            # Group names and numbers would clash once rules are combined into one regex
+            if re.search(r'\(\?P[<=]|(?<!\\)(?:\\\\)*\\[1-9]', pattern[3:]):
+                raise ValueError(f"Invalid rule '{text}': named groups and backreferences are not supported")
+            regex = '.*?(?:' + pattern[3:] + ').*'
+            dir_only = False
+        else:
+            dir_only = pattern.endswith('/')
+            regex = glob_to_regex(pattern.rstrip('/'))
+        try:
+            re.compile(regex)
+        except re.error as e:
+            raise ValueError(f"Invalid rule '{text}': {str(e)}")
+        path_rules.append({'text': text, 'regex': regex, 'include': include, 'dir_only': dir_only})
+
+    def combine(rules):
+        # Latest rule first, so the first alternative that matches is the one that wins
+        parts = [f"(?P<_r{i}>{rule['regex']})" for i, rule in reversed(list(enumerate(rules)))]
+        try:
+            return re.compile('|'.join(parts), re.DOTALL) if parts else None
+        except re.error as e:
+            raise ValueError(f"Invalid rules: {str(e)}")
+
+    file_rules = [rule for rule in path_rules if not rule['dir_only']]
+    return {
+        'dir_rules': path_rules,
+        'dir_regex': combine(path_rules),
+        'file_rules': file_rules,
+        'file_regex': combine(file_rules),
+        'limits': limits
+    }
+
+def get_matcher(entry):
+    """Compiled rules for a backup entry: global rules followed by the entry's own rules"""
+    rules = tuple(backup_config.get('exclude_rules', [])) + tuple(entry.get('rules', []))
+    return compile_rules(rules) if rules else None
+
+def match_path(matcher, relpath, is_dir):
+    """Return the text of the rule that excludes relpath, or None if it is kept"""
+    if matcher is None:
+        return None
+    regex = matcher['dir_regex'] if is_dir else matcher['file_regex']
+    match = regex.fullmatch(relpath) if regex else None
+    if not match:
+        return None
+    rule = (matcher['dir_rules'] if is_dir else matcher['file_rules'])[int(match.lastgroup[2:])]
+    return None if rule['include'] else rule['text']
+
+def match_limits(matcher, st):
+    """Return the text of the size/age rule that excludes a file with this stat, or None"""
+    if matcher is None:
+        return None
+    for kind, limit, text in matcher['limits']:
+        if kind == 'size' and st.st_size > limit:
+            return text
+        if kind == 'age' and time.time() - st.st_mtime > limit:
+            return text
+    return None
+
+def count_skip(report, rule, size=0, is_dir=False):
+    """Count a skipped file or pruned folder against a rule; size None means it was not looked up"""
+    if report is None:
+        return
+    counts = report.setdefault(rule, {'files': 0, 'bytes': 0, 'dirs': 0, 'unsized': 0})
+    if is_dir:
+        counts['dirs'] += 1
+    else:
+        counts['files'] += 1
+        if size is None:
+            counts['unsized'] += 1
+        else:
+            counts['bytes'] += size
+
+def scan_tree(path, onerror=None, matcher=None, report=None, max_depth=None):
+    """
+    Walk a folder with os.scandir, yielding (dirpath, file_entries) once per directory.
+    File types come from the directory listing itself, so no per-file stat is needed
+    to tell files from folders. Symlinked folders are not followed, same as os.walk.
+    Folders excluded by the matcher are pruned before they are listed; files excluded
+    by a path rule are left out and counted in report.
+    """
+    stack = [(path, '', 0)]
+    while stack:
+        current, rel, depth = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = list(it)
+        except OSError as e:
+            if onerror:
+                onerror(e)
+            continue
+
+        files = []
+        subdirs = []
+        for entry in entries:
+            try:
+                relpath = rel + entry.name
+                if entry.is_dir():
+                    if entry.is_symlink() or (max_depth is not None and depth >= max_depth):
+                        continue
+                    rule = match_path(matcher, relpath, True)
+                    if rule:
+                        count_skip(report, rule, is_dir=True)
+                    else:
+                        subdirs.append((entry.path, relpath + '/', depth + 1))
+                else:
+                    rule = match_path(matcher, relpath, False)
+                    if rule:
+                        # Only Windows has the size from the listing; elsewhere it would cost a stat per skipped file
+                        count_skip(report, rule, entry_size(entry) if os.name == 'nt' else None)
+                    else:
+                        files.append(entry)
+            except OSError as e:
+                if onerror:
+                    onerror(e)
+
+        yield current, files
+        # Reverse so folders are visited in listing order
+        stack.extend(reversed(subdirs))
+
+def entry_stat(entry):
+    try:
+        return entry.stat()
+    except OSError:
+        return None
+
+def entry_size(entry):
+    st = entry_stat(entry)
+    return st.st_size if st else 0
+
+def rule_report_lines(report):
+    """Format a skip report for history/stats, largest savings first"""
+    lines = []
+    for rule, counts in sorted(report.items(), key=lambda item: (item[1]['bytes'], item[1]['dirs']), reverse=True):
+        line = f"{rule}: {counts['files']} files"
+        if counts['unsized'] < counts['files']:
+            line += f", {counts['bytes'] / (1024 * 1024):.2f} MB"
+        if counts['dirs']:
+            line += f", {counts['dirs']} folders pruned"
+        lines.append(line)
+    return lines
+
+def iter_backup_sources(warnings, report=None):
+    """
+    Yield (full_path, arcname, matcher) for everything configured for backup, folders first.
+    Paths excluded by include/exclude rules are counted in report instead.
+    """
+    for folder in backup_config['folders']:
+        path = folder['path']
+        if not os.path.exists(path):
+            error_msg = f"Missing folder: {path}"
+            warnings.append(error_msg)
+            logging.warning(error_msg)
+            continue
+
+        def folder_error(err, path=path):
+            error_msg = f"Error processing folder {path}: {str(err)}"
+            warnings.append(error_msg)
+            logging.warning(error_msg)
+
+        base = os.path.basename(path)
+        matcher = get_matcher(folder)
+        for _, entries in scan_tree(path, onerror=folder_error, matcher=matcher, report=report):
+            for entry in entries:
+                yield entry.path, os.path.join(base, os.path.relpath(entry.path, path)), matcher
+
+    for file in backup_config['files']:
+        path = file['path']
+        if os.path.exists(path):
+            matcher = get_matcher(file)
+            rule = match_path(matcher, os.path.basename(path), False)
+            if rule:
+                count_skip(report, rule, os.path.getsize(path))
+            else:
+                yield path, os.path.basename(path), matcher
+        else:
+            error_msg = f"Missing file: {path}"
+            warnings.append(error_msg)
+            logging.warning(error_msg)
+
+def prefetch_file(path, max_bytes, matcher=None):
+    """
+    Open a file, stat it through the open handle and, if it is no larger than
+    max_bytes, read it whole into a single buffer.
+    Returns (stat_result, buffer, error, skip_rule); buffer is None for files left
+    to stream and for files excluded by a size/age rule.
+    """
+    try:
+        with open(path, 'rb', buffering=0) as f:
+            st = os.fstat(f.fileno())
+            rule = match_limits(matcher, st)
+            if rule or st.st_size > max_bytes:
+                return st, None, None, rule
+            data = bytearray(st.st_size)
+            view = memoryview(data)
+            filled = 0
+            while filled < st.st_size:
+                n = f.readinto(view[filled:])
+                if not n:
+                    break
+                filled += n
+            view.release()
+            if filled < st.st_size:
+                # File shrank while we were reading it
+                del data[filled:]
+            return st, data, None, None
+    except Exception as e:
+        return None, None, e, None
+
+def read_ahead(sources, depth, max_bytes):
+    """
+    Yield (full_path, arcname, stat_result, buffer, error, skip_rule) for each source,
+    in order, keeping up to depth files being opened and read in background threads.
+    """
+    if depth <= 0:
+        for full_path, arcname, matcher in sources:
+            yield (full_path, arcname) + prefetch_file(full_path, max_bytes, matcher)
+        return
+
+    with ThreadPoolExecutor(max_workers=depth) as executor:
+        pending = deque()
+        for full_path, arcname, matcher in sources:
+            pending.append((full_path, arcname, executor.submit(prefetch_file, full_path, max_bytes, matcher)))
+            if len(pending) >= depth:
+                full_path, arcname, future = pending.popleft()
+                yield (full_path, arcname) + future.result()
+        while pending:
+            full_path, arcname, future = pending.popleft()
+            yield (full_path, arcname) + future.result()
+
+def zipinfo_from_stat(arcname, st):
+    """Build the same ZipInfo zipfile.write() would, from a stat we already have"""
+    zinfo = zipfile.ZipInfo(arcname, time.localtime(st.st_mtime)[0:6])
+    zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+    zinfo.file_size = st.st_size
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    return zinfo
+
+def solid_sort_key(source):
+    """Order files by extension, then folder, so similar content lands in the same block"""
+    arcname = source[1]
+    return os.path.splitext(arcname)[1].lower(), os.path.dirname(arcname), arcname
+
+def add_to_solid_block(block, index, arcname, st, data):
+    """Append a small file to the current block and record where it lives"""
+    index['members'][arcname] = [len(index['blocks']), len(block), len(data), st.st_mtime, st.st_mode]
+    block += data
+
+def write_solid_block(zipf, block, index, compress_type):
+    """Compress the buffered block as one zip member, returning its compressed size"""
+    name = f"{SOLID_DIR}/block_{len(index['blocks']):06d}.bin"
+    zinfo = zipfile.ZipInfo(name, time.localtime()[0:6])
+    zinfo.external_attr = 0o644 << 16
+    zinfo.compress_type = compress_type
+    zipf.writestr(zinfo, block)
+    index['blocks'].append(name)
+    block.clear()
+    return zipf.getinfo(name).compress_size
+
+def load_solid_index(zipf):
+    """Return the solid index of an open archive, or None if it has no solid blocks"""
+    try:
+        return json.loads(zipf.read(f"{SOLID_DIR}/index.json"))
+    except KeyError:
+        return None
+
+def read_archive_member(zipf, arcname, index=None):
+    """
+    Read one backed up file from an open archive, whether it was stored as its own
+    zip entry or inside a solid block. Only the block holding it is decompressed,
+    and only up to the member's end.
+    """
+    index = index if index is not None else load_solid_index(zipf)
+    if index and arcname in index['members']:
+        block, offset, size = index['members'][arcname][:3]
+        with zipf.open(index['blocks'][block]) as f:
+            f.seek(offset)
+            return f.read(size)
+    return zipf.read(arcname)
+
+def fadvise(fd, advice):
+    """
+    Best-effort posix_fadvise over a whole file, e.g. fadvise(fd, 'DONTNEED').
+    Returns True if the advice was given, False where it is unsupported or failed.
+    """
+    advice = getattr(os, f'POSIX_FADV_{advice}', None)
+    if advice is None:
+        return False
+    try:
+        os.posix_fadvise(fd, 0, 0, advice)
+        return True
+    except OSError:
+        return False
+
+def new_cache_stats():
+    """
+    Per-run page cache accounting: source bytes read and left cached ('kept') or
+    advised DONTNEED ('dropped'), and the archive offset up to which its pages
+    were written out and dropped ('archive_dropped')
+    """
+    return {'kept': 0, 'dropped': 0, 'archive_dropped': 0}
+
+def read_blocks(path, buffer, cache_stats=None):
+    """
+    Yield a file's contents as views into one reusable buffer, filled with readinto.
+    The kernel is told the file is read sequentially and its pages are dropped
+    afterwards, so a multi-GB backup does not push everything else out of the page cache.
+    Each view is only valid until the next one is yielded.
+    """
+    view = memoryview(buffer)
+    read = 0
+    with open(path, 'rb') as src:
+        fadvise(src.fileno(), 'SEQUENTIAL')
+        try:
+            while True:
+                n = src.readinto(buffer)
+                if not n:
+                    break
+                read += n
+                yield view[:n]
+        finally:
+            dropped = fadvise(src.fileno(), 'DONTNEED')
+            if cache_stats is not None:
+                cache_stats['dropped' if dropped else 'kept'] += read
+
+def drop_archive_cache(zipf, cache_stats=None):
+    """Write out what has been written to the archive so far and drop it from the page cache"""
+    if not hasattr(os, 'fdatasync'):
+        return
+    try:
+        zipf.fp.flush()
+        position = zipf.fp.tell()
+        os.fdatasync(zipf.fp.fileno())
+        if fadvise(zipf.fp.fileno(), 'DONTNEED') and cache_stats is not None:
+            cache_stats['archive_dropped'] = position
+    except (OSError, AttributeError, ValueError):
+        pass
+
+def drop_finished_archive(zip_path, cache_stats=None):
+    """
+    Write out a closed archive and drop all of it from the page cache, including the
+    small members, solid blocks and central directory written after the last large file
+    """
+    if not hasattr(os, 'fdatasync'):
+        return
+    try:
+        with open(zip_path, 'r+b') as f:
+            os.fdatasync(f.fileno())
+            if fadvise(f.fileno(), 'DONTNEED') and cache_stats is not None:
+                cache_stats['archive_dropped'] = os.fstat(f.fileno()).st_size
+    except OSError:
+        pass
+
+def write_large_file(zipf, full_path, arcname, st, buffer, cache_stats=None):
+    """
+    Stream a large file into the archive through read_blocks, dropping the archive's
+    pages whenever another ARCHIVE_SYNC_BYTES of it has been written
+    """
+    synced_at = zipf.fp.tell()
+    with zipf.open(zipinfo_from_stat(arcname, st), 'w', force_zip64=True) as dest:
+        for block in read_blocks(full_path, buffer, cache_stats):
+            dest.write(block)
+            if zipf.fp.tell() - synced_at >= ARCHIVE_SYNC_BYTES:
+                drop_archive_cache(zipf, cache_stats)
+                synced_at = zipf.fp.tell()
+    drop_archive_cache(zipf, cache_stats)
+
+def signature_path(full_path):
+    name = hashlib.sha1(os.path.abspath(full_path).encode('utf-8', 'surrogateescape')).hexdigest()
+    return os.path.join(backup_config['destination'], SIGNATURE_DIR, name + '.json')
+
+def load_signature(full_path):
+    try:
+        with open(signature_path(full_path), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_signatures(signatures):
+    """Persist the block signatures collected by a successful run"""
+    os.makedirs(os.path.join(backup_config['destination'], SIGNATURE_DIR), exist_ok=True)
+    for full_path, signature in signatures.items():
+        with open(signature_path(full_path), 'w') as f:
+            json.dump(signature, f)
+
+def block_signature(block):
+    """rsync-style pair: a cheap weak checksum and a strong hash to confirm matches"""
+    return zlib.adler32(block), hashlib.blake2b(block, digest_size=16).hexdigest()
+
+def write_delta_member(zip_filename, zipf, full_path, arcname, st, signatures, manifest, cache_stats=None):
+    """
+    Store a file over the delta threshold. If the last backup of it left a usable
+    signature, only blocks not found in that signature are stored, in
+    __delta__/<arcname>.blocks, plus a recipe (__delta__/<arcname>.json) that
+    rebuilds the file from the base archive: each entry of 'blocks' is either a
+    base block number (>= 0) or -(n + 1) for the n-th stored block. Otherwise the
+    file is stored whole under its own name. Either way its new signature is
+    queued in signatures. Returns the number of bytes of file data stored.
+
+    Blocks are compared at block-aligned offsets rather than rolled byte by byte:
+    disk images and database dumps change in place, and a rolling search in
+    Python would be far too slow on files of tens of GB.
+    """
+    block_size = backup_config.get('delta_block_kb', 1024) * 1024
+    base = load_signature(full_path)
+    usable = (base is not None
+              and base['archive'] != zip_filename
+              and base['block_size'] == block_size
+              and base['chain'] < min(backup_config.get('delta_max_chain', 7), MAX_DELTA_DEPTH)
+              and os.path.isfile(os.path.join(backup_config['destination'], base['archive'])))
+
+    weak = []
+    strong = []
+    size = 0
+    stored = 0
+    buffer = bytearray(block_size)
+    if not usable:
+        with zipf.open(zipinfo_from_stat(arcname, st), 'w', force_zip64=True) as dest:
+            for block in read_blocks(full_path, buffer, cache_stats):
+                dest.write(block)
+                block_weak, block_strong = block_signature(block)
+                weak.append(block_weak)
+                strong.append(block_strong)
+                size += len(block)
+        stored = size
+        chain = 0
+    else:
+        recipe = []
+        if st.st_size == base['size'] and st.st_mtime == base['mtime']:
+            # Same quick check as rsync: unchanged size and mtime means unchanged content
+            recipe = list(range(len(base['strong'])))
+            weak, strong, size = base['weak'], base['strong'], base['size']
+        else:
+            lookup = {}
+            for j, (block_weak, block_strong) in enumerate(zip(base['weak'], base['strong'])):
+                lookup.setdefault(block_weak, {}).setdefault(block_strong, j)
+            new_blocks = 0
+            with zipf.open(zipinfo_from_stat(f"{DELTA_DIR}/{arcname}.blocks", st), 'w', force_zip64=True) as dest:
+                for block in read_blocks(full_path, buffer, cache_stats):
+                    block_weak, block_strong = block_signature(block)
+                    weak.append(block_weak)
+                    strong.append(block_strong)
+                    size += len(block)
+                    j = lookup.get(block_weak, {}).get(block_strong)
+                    if j is None:
+                        dest.write(block)
+                        new_blocks += 1
+                        stored += len(block)
+                        recipe.append(-new_blocks)
+                    else:
+                        recipe.append(j)
+
+        zipf.writestr(f"{DELTA_DIR}/{arcname}.json", json.dumps({
+            'base': base['archive'],
+            'base_arcname': base['arcname'],
+            'size': size,
+            'block_size': block_size,
+            'mtime': st.st_mtime,
+            'mode': st.st_mode,
+            'blocks': recipe
+        }))
+        manifest[arcname] = base['archive']
+        chain = base['chain'] + 1
+    drop_archive_cache(zipf, cache_stats)
+
+    signatures[full_path] = {
+        'path': full_path,
+        'archive': zip_filename,
+        'arcname': arcname,
+        'size': size,
+        'mtime': st.st_mtime,
+        'block_size': block_size,
+        'chain': chain,
+        'weak': weak,
+        'strong': strong
+    }
+    return stored
+
+def apply_file_metadata(path, mtime, mode):
+    """Give a restored file back its modification time and permission bits, where known"""
+    try:
+        os.chmod(path, stat.S_IMODE(mode) if mode else 0o644)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+    except OSError as e:
+        logging.warning(f"Could not restore metadata of {path}: {str(e)}")
+
+def resolve_delta_blocks(zip_path, member, block_size, seen=()):
+    """
+    Map every block of a backed up file to where its bytes are actually stored,
+    following delta recipes back to the last full copy. Returns a list with one
+    (archive_path, stored_member, offset, length) per block of the file.
+    Raises ValueError if the chain loops or is implausibly long.
+    """
+    key = (os.path.abspath(zip_path), member)
+    if key in seen:
+        raise ValueError(f"Delta chain of {member} loops back to {os.path.basename(zip_path)}")
+    if len(seen) > MAX_DELTA_DEPTH:
+        raise ValueError(f"Delta chain of {member} is longer than {MAX_DELTA_DEPTH} archives")
+    seen = seen + (key,)
+
+    with zipfile.ZipFile(zip_path, 'r') as zipf:
+        try:
+            recipe = json.loads(zipf.read(f"{DELTA_DIR}/{member}.json"))
+        except KeyError:
+            recipe = None
+        if recipe is None:
+            size = zipf.getinfo(member).file_size
+            return [(zip_path, member, offset, min(block_size, size - offset))
+                    for offset in range(0, size, block_size)]
+
+    if recipe['block_size'] != block_size:
+        raise ValueError(f"Delta chain of {member} mixes block sizes")
+    base_blocks = resolve_delta_blocks(os.path.join(os.path.dirname(zip_path), recipe['base']),
+                                       recipe['base_arcname'], block_size, seen)
+    blocks = []
+    for i, ref in enumerate(recipe['blocks']):
+        if ref >= 0:
+            blocks.append(base_blocks[ref])
+        else:
+            length = min(block_size, recipe['size'] - i * block_size)
+            blocks.append((zip_path, f"{DELTA_DIR}/{member}.blocks", (-ref - 1) * block_size, length))
+    return blocks
+
+def restore_file(zip_path, member, target_path):
+    """
+    Restore one backed up file to target_path. Delta members are resolved through
+    their chain of bases first, then every stored member involved is read once,
+    front to back, and its blocks are written where they belong in the target.
+    The file is assembled in a temporary file next to the target and moved into
+    place once complete.
+    """
+    with zipfile.ZipFile(zip_path, 'r') as zipf:
+        try:
+            recipe = json.loads(zipf.read(f"{DELTA_DIR}/{member}.json"))
+        except KeyError:
+            recipe = None
+        if recipe is None:
+            info = zipf.getinfo(member) if member in zipf.NameToInfo else None
+            index = load_solid_index(zipf) if info is None else None
+            if info is None and not (index and member in index['members']):
+                raise KeyError(member)
+
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target_path) or '.', prefix='.restore-')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            if recipe is None:
+                with zipfile.ZipFile(zip_path, 'r') as zipf:
+                    if info is not None:
+                        with zipf.open(info) as src:
+                            shutil.copyfileobj(src, out, 1024 * 1024)
+                        mtime = time.mktime(info.date_time + (0, 0, -1))
+                        mode = info.external_attr >> 16
+                    else:
+                        out.write(read_archive_member(zipf, member, index))
+                        mtime, mode = index['members'][member][3:5]
+            else:
+                block_size = recipe['block_size']
+                blocks = resolve_delta_blocks(zip_path, member, block_size)
+                # archive -> stored member -> offset -> (length, target offsets)
+                sources = {}
+                for i, (archive, stored, offset, length) in enumerate(blocks):
+                    pieces = sources.setdefault(archive, {}).setdefault(stored, {})
+                    pieces.setdefault(offset, (length, []))[1].append(i * block_size)
+
+                out.truncate(recipe['size'])
+                for archive, members in sources.items():
+                    with zipfile.ZipFile(archive, 'r') as zipf:
+                        for stored, pieces in members.items():
+                            with zipf.open(stored) as src:
+                                # Ascending offsets, so the stream only ever seeks forward
+                                for offset in sorted(pieces):
+                                    length, targets = pieces[offset]
+                                    src.seek(offset)
+                                    data = src.read(length)
+                                    for target_offset in targets:
+                                        out.seek(target_offset)
+                                        out.write(data)
+                mtime, mode = recipe['mtime'], recipe['mode']
+        apply_file_metadata(temp_path, mtime, mode)
+        os.replace(temp_path, target_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def required_delta_bases(destination, archives):
+    """Names of the archives that delta members in the given archives are built on, following chains"""
+    required = set()
+    pending = list(archives)
+    while pending:
+        name = pending.pop()
+        try:
+            with zipfile.ZipFile(os.path.join(destination, name), 'r') as zipf:
+                manifest = json.loads(zipf.read(f"{DELTA_DIR}/manifest.json"))
+        except (KeyError, OSError, ValueError, zipfile.BadZipFile):
+            continue
+        for base in set(manifest.values()):
+            if base not in required:
+                required.add(base)
+                pending.append(base)
+    return required
+
 def run_backup():
 
     # Check permissions before starting backup
@@ -374,8 +1246,25 @@ def run_backup():
     success = True
     backup_size = 0
     files_processed = 0
-    
-    logging.info(f"Starting backup: {zip_filename}")
+    bytes_in = 0
+    rule_report = {}
+    solid = backup_config.get('solid_mode', False)
+    solid_max_bytes = backup_config.get('solid_max_file_kb', 64) * 1024
+    solid_block_bytes = backup_config.get('solid_block_mb', 16) * 1024 * 1024
+    solid_index = {'version': 1, 'blocks': [], 'members': {}}
+    solid_bytes_in = 0
+    solid_bytes_out = 0
+    delta = backup_config.get('delta_mode', False)
+    delta_min_bytes = backup_config.get('delta_min_mb', 256) * 1024 * 1024
+    delta_signatures = {}
+    delta_manifest = {}
+    delta_bytes = 0
+    large_min_bytes = backup_config.get('large_file_mb', 64) * 1024 * 1024
+    large_buffer = None
+    large_files = 0
+    large_bytes = 0
+    cache_stats = new_cache_stats()
+    started = time.time()
     
     # Check if destination folder exists
     if not os.path.exists(backup_config['destination']):
@@ -388,59 +1277,114 @@ def run_backup():
             logging.error(f"{error_msg}\n{traceback.format_exc()}")
             success = False
 
+    # Runs started in the same second (manual and scheduled) must not overwrite
+    # each other's archive, which a delta signature may name as its base
+    counter = 1
+    while success:
+        try:
+            open(zip_path, 'x').close()
+            break
+        except FileExistsError:
+            counter += 1
+            zip_filename = f"{backup_config['zip_name']}_{date_str}_{counter}.zip"
+            zip_path = os.path.join(backup_config['destination'], zip_filename)
+        except OSError:
+            break  # reported when the zip file is created
+
+    logging.info(f"Starting backup: {zip_filename}")
+
     try:
         with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Process folders
-            for folder in backup_config['folders']:
-                path = folder['path']
-                if os.path.exists(path):
-                    try:
-                        for root, _, files in os.walk(path):
-                            for file in files:
-                                try:
-                                    full_path = os.path.join(root, file)
-                                    arcname = os.path.relpath(full_path, path)
-                                    zipf.write(full_path, os.path.join(os.path.basename(path), arcname))
-                                    files_processed += 1
-                                except Exception as e:
-                                    error_msg = f"Error adding file {full_path} to zip: {str(e)}"
-                                    warnings.append(error_msg)
-                                    logging.warning(error_msg)
-                    except Exception as e:
-                        error_msg = f"Error processing folder {path}: {str(e)}"
-                        warnings.append(error_msg)
-                        logging.error(f"{error_msg}\n{traceback.format_exc()}")
-                else:
-                    error_msg = f"Missing folder: {path}"
-                    warnings.append(error_msg)
-                    logging.warning(error_msg)
+            # Small files are opened and read ahead of the archiver so that
+            # latency on network mounts overlaps instead of adding up
+            sources = iter_backup_sources(warnings, rule_report)
+            max_bytes = backup_config.get('prefetch_max_file_kb', 1024) * 1024
+            if solid:
+                # Only paths are needed to sort, so this costs no extra I/O
+                sources = sorted(sources, key=solid_sort_key)
+                max_bytes = max(max_bytes, solid_max_bytes)
+                compress_type = SOLID_COMPRESSION.get(backup_config.get('solid_compression'), zipfile.ZIP_DEFLATED)
+                block = bytearray()
+            # Files due for delta or streaming are never read whole, whatever the prefetch limits
+            streamed_min_bytes = min(delta_min_bytes, large_min_bytes) if delta else large_min_bytes
+            max_bytes = min(max_bytes, streamed_min_bytes - 1)
 
-            # Process files
-            for file in backup_config['files']:
-                path = file['path']
-                if os.path.exists(path):
-                    try:
-                        zipf.write(path, os.path.basename(path))
-                        files_processed += 1
-                    except Exception as e:
-                        error_msg = f"Error adding file {path} to zip: {str(e)}"
-                        warnings.append(error_msg)
-                        logging.warning(error_msg)
-                else:
-                    error_msg = f"Missing file: {path}"
+            sources = read_ahead(sources, backup_config.get('prefetch_depth', 0), max_bytes)
+            for full_path, arcname, st, data, error, skip_rule in sources:
+                try:
+                    if error:
+                        raise error
+                    if skip_rule:
+                        count_skip(rule_report, skip_rule, st.st_size)
+                        continue
+                    # Route by size first, so no prefetch setting can pull a file out of delta or streaming
+                    if delta and st.st_size >= delta_min_bytes:
+                        delta_bytes += write_delta_member(zip_filename, zipf, full_path, arcname.replace(os.sep, '/'),
+                                                          st, delta_signatures, delta_manifest, cache_stats)
+                    elif st.st_size >= large_min_bytes:
+                        if large_buffer is None:
+                            large_buffer = bytearray(backup_config.get('large_file_buffer_mb', 8) * 1024 * 1024)
+                        write_large_file(zipf, full_path, arcname, st, large_buffer, cache_stats)
+                        large_files += 1
+                        large_bytes += st.st_size
+                    elif solid and data is not None and len(data) <= solid_max_bytes:
+                        if arcname in solid_index['members']:
+                            error_msg = f"Duplicate entry {arcname} in solid blocks, skipped {full_path}"
+                            warnings.append(error_msg)
+                            logging.warning(error_msg)
+                            continue
+                        add_to_solid_block(block, solid_index, arcname, st, data)
+                        solid_bytes_in += len(data)
+                        cache_stats['kept'] += len(data)
+                        if len(block) >= solid_block_bytes:
+                            solid_bytes_out += write_solid_block(zipf, block, solid_index, compress_type)
+                    elif data is not None:
+                        zipf.writestr(zipinfo_from_stat(arcname, st), data)
+                        cache_stats['kept'] += len(data)
+                    else:
+                        zipf.write(full_path, arcname)
+                        cache_stats['kept'] += st.st_size
+                    files_processed += 1
+                    bytes_in += st.st_size
+                except Exception as e:
+                    error_msg = f"Error adding file {full_path} to zip: {str(e)}"
                     warnings.append(error_msg)
                     logging.warning(error_msg)
+
+            if solid and solid_index['members']:
+                if block:
+                    solid_bytes_out += write_solid_block(zipf, block, solid_index, compress_type)
+                zipf.writestr(f"{SOLID_DIR}/index.json", json.dumps(solid_index))
+            if delta_manifest:
+                zipf.writestr(f"{DELTA_DIR}/manifest.json", json.dumps(delta_manifest))
     except Exception as e:
         error_msg = f"Failed to create zip file: {str(e)}"
         warnings.append(error_msg)
         logging.error(f"{error_msg}\n{traceback.format_exc()}")
         success = False
+    if success:
+        drop_finished_archive(zip_path, cache_stats)
+    invalidate_destination_cache()
 
     # Check if the zip file was created and get its size
     if success and os.path.exists(zip_path):
         try:
             backup_size = os.path.getsize(zip_path) / (1024 * 1024)
             history_entry = f"{zip_filename} - {backup_size:.2f} MB - {files_processed} files"
+            # What this run read or wrote without advising DONTNEED: an upper bound on
+            # what it left in the page cache, since some of it may have been cached already
+            archive_kept = os.path.getsize(zip_path) - cache_stats['archive_dropped']
+            run_stats = record_run_stats(solid, files_processed, bytes_in, os.path.getsize(zip_path),
+                                         time.time() - started, solid_index, solid_bytes_in, solid_bytes_out, {
+                                             'large_files': large_files,
+                                             'large_mb': round(large_bytes / (1024 * 1024), 2),
+                                             'page_cache_left_mb': round((cache_stats['kept'] + archive_kept) / (1024 * 1024), 2),
+                                             'page_cache_dropped_mb': round((cache_stats['dropped'] + cache_stats['archive_dropped']) / (1024 * 1024), 2)
+                                         })
+            if solid:
+                history_entry += f" ({run_stats['solid_files']} in {run_stats['solid_blocks']} solid blocks, ratio {run_stats['solid_ratio']})"
+            if delta_manifest:
+                history_entry += f" ({len(delta_manifest)} delta files, {delta_bytes / (1024 * 1024):.2f} MB of changed blocks)"
             logging.info(f"Backup completed: {history_entry}")
         except Exception as e:
             history_entry = f"{zip_filename} - SIZE UNKNOWN - Error: {str(e)}"
@@ -450,13 +1394,25 @@ def run_backup():
         logging.error(f"Backup failed: {zip_filename}")
         success = False
 
+    # Signatures only move forward once the archive they point at is complete
+    if success and delta_signatures:
+        try:
+            save_signatures(delta_signatures)
+        except Exception as e:
+            error_msg = f"Failed to save delta signatures: {str(e)}"
+            warnings.append(error_msg)
+            logging.error(f"{error_msg}\n{traceback.format_exc()}")
+
     # Update backup history and stats
     backup_config['history'].insert(0, history_entry)
     if len(backup_config['history']) > 20:
         backup_config['history'].pop()
     backup_config['stats']['run_count'] += 1
     backup_config['stats']['last_backup'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    backup_config['stats']['rule_skips'] = rule_report_lines(rule_report)
     backup_config['last_warnings'] = warnings
+    for line in backup_config['stats']['rule_skips']:
+        logging.info(f"Skipped by rule {line}")
 
     update_next_backup_time()
 
@@ -491,6 +1447,37 @@ def run_backup():
     
     return success, warnings
 
+def record_run_stats(solid, files, bytes_in, bytes_out, seconds, solid_index, solid_bytes_in, solid_bytes_out, extra=None):
+    """
+    Store ratio and throughput of the run, plus any extra figures, in stats['last_run'].
+    Standard runs become the baseline that solid runs are compared against.
+    """
+    seconds = max(seconds, 0.001)
+    run_stats = {
+        'mode': 'solid' if solid else 'standard',
+        'files': files,
+        'bytes_in': bytes_in,
+        'bytes_out': bytes_out,
+        'seconds': round(seconds, 2),
+        'ratio': round(bytes_in / bytes_out, 2) if bytes_out else 0,
+        'files_per_second': round(files / seconds, 1),
+        'mb_per_second': round(bytes_in / (1024 * 1024) / seconds, 2)
+    }
+    run_stats.update(extra or {})
+    if solid:
+        run_stats['solid_files'] = len(solid_index['members'])
+        run_stats['solid_blocks'] = len(solid_index['blocks'])
+        run_stats['solid_ratio'] = round(solid_bytes_in / solid_bytes_out, 2) if solid_bytes_out else 0
+        baseline = backup_config['stats'].get('standard_run')
+        if baseline and baseline['files_per_second'] and baseline['ratio']:
+            run_stats['speed_gain'] = round(run_stats['files_per_second'] / baseline['files_per_second'], 2)
+            run_stats['ratio_gain'] = round(run_stats['ratio'] / baseline['ratio'], 2)
+    else:
+        backup_config['stats']['standard_run'] = run_stats
+    backup_config['stats']['last_run'] = run_stats
+    logging.info(f"Run stats: {json.dumps(run_stats)}")
+    return run_stats
+
 def schedule_backups():
     schedule.every(backup_config['frequency_minutes']).minutes.do(run_backup)
     while True:
@@ -506,17 +1493,25 @@ def get_stats():
     for file_entry in backup_config['files']:
         path = file_entry['path']
         if os.path.exists(path):
-            total_size += os.path.getsize(path)
+            matcher = get_matcher(file_entry)
+            if match_path(matcher, os.path.basename(path), False):
+                continue
+            st = os.stat(path)
+            if not match_limits(matcher, st):
+                total_size += st.st_size
 
-    for folder_entry in backup_config['folders']:
-        path = folder_entry['path']
-        if os.path.exists(path):
-            for root, _, files in os.walk(path):
-                for file in files:
-                    try:
-                        total_size += os.path.getsize(os.path.join(root, file))
-                    except:
-                        continue
+    # Stat each directory's files as one batch spread over the read-ahead threads
+    depth = backup_config.get('prefetch_depth', 0)
+    with ThreadPoolExecutor(max_workers=max(depth, 1)) as executor:
+        mapper = executor.map if depth > 0 else map
+        for folder_entry in backup_config['folders']:
+            path = folder_entry['path']
+            if os.path.exists(path):
+                matcher = get_matcher(folder_entry)
+                for _, entries in scan_tree(path, matcher=matcher):
+                    for st in mapper(entry_stat, entries):
+                        if st and not match_limits(matcher, st):
+                            total_size += st.st_size
 
     return {
         'total_size': round(total_size / (1024 * 1024), 2),
@@ -524,6 +1519,64 @@ def get_stats():
         'folder_count': folder_count
     }
 
+# Source trees are not watched, so stats are recomputed at most every STATS_CACHE_SECONDS
+stats_cache = {'key': None, 'time': 0, 'value': None}
+
+def get_cached_stats():
+    key = json.dumps([backup_config['files'], backup_config['folders'], backup_config.get('exclude_rules', [])], sort_keys=True)
+    if stats_cache['key'] != key or time.time() - stats_cache['time'] > STATS_CACHE_SECONDS:
+        stats_cache.update(key=key, time=time.time(), value=get_stats())
+    return stats_cache['value']
+
+# Listing of the destination folder, reused until a run or the retention policy
+# changes it (or the folder's mtime shows someone else did). Sorted views are
+# built lazily per (sort, order).
+destination_cache = {'path': None, 'mtime_ns': None, 'version': 0, 'entries': None, 'sorted': {}}
+destination_cache_lock = threading.Lock()
+
+def invalidate_destination_cache():
+    with destination_cache_lock:
+        destination_cache['version'] += 1
+        destination_cache['entries'] = None
+        destination_cache['sorted'] = {}
+
+def list_destination(sort='name', order='asc'):
+    """
+    Return (entries, etag, last_modified) for the destination folder, sorted by
+    name, size or mtime. Entries are dicts with name, size, mtime and is_dir.
+    """
+    destination = backup_config['destination']
+    try:
+        mtime_ns = os.stat(destination).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+
+    with destination_cache_lock:
+        cache = destination_cache
+        if cache['entries'] is None or cache['path'] != destination or cache['mtime_ns'] != mtime_ns:
+            entries = []
+            try:
+                with os.scandir(destination) as it:
+                    for entry in it:
+                        if entry.name == SIGNATURE_DIR:
+                            continue
+                        st = entry_stat(entry)
+                        entries.append({
+                            'name': entry.name,
+                            'size': st.st_size if st else 0,
+                            'mtime': st.st_mtime if st else 0,
+                            'is_dir': entry.is_dir()
+                        })
+            except OSError as e:
+                logging.warning(f"Could not list destination folder {destination}: {str(e)}")
+            cache.update(path=destination, mtime_ns=mtime_ns, entries=entries, sorted={})
+
+        key = (sort, order)
+        if key not in cache['sorted']:
+            cache['sorted'][key] = sorted(cache['entries'], key=lambda entry: entry[sort], reverse=(order == 'desc'))
+        etag = hashlib.md5(f"{destination}|{cache['version']}|{mtime_ns}".encode()).hexdigest()
+        return cache['sorted'][key], etag, (mtime_ns / 1e9 if mtime_ns else None)
+
 def validate_path(path):
     """Validate a file or folder path to prevent path traversal attacks"""
     # Normalize the path to handle different formats
@@ -566,7 +1619,7 @@ def check_filesystem_permissions(paths_to_check):
     # Check source files
     for file_entry in paths_to_check.get('files', []):
         path = file_entry.get('path', '')
-        if path and os.path.exists(path):
+        if path and os.path.exists(path) and not match_path(get_matcher(file_entry), os.path.basename(path), False):
             if not os.access(path, os.R_OK):
                 warnings.append(f"No read permission for file: {path}")
     
@@ -581,20 +1634,22 @@ def check_filesystem_permissions(paths_to_check):
             if not os.access(path, os.X_OK):
                 warnings.append(f"No traverse permission for folder: {path}")
                 
-            # Check sample of subfolders for read permissions
-            for root, dirs, files in os.walk(path, topdown=True, onerror=lambda err: warnings.append(f"Error accessing subfolder in {path}: {str(err)}")):
-                # Limit depth for performance
-                if root.count(os.sep) - path.count(os.sep) > 2:
-                    del dirs[:]
-                    continue
-                    
+            # Check sample of subfolders for read permissions, skipping what the rules exclude
+            matcher = get_matcher(folder_entry)
+            # Limit depth for performance
+            for root, files in scan_tree(path, onerror=lambda err: warnings.append(f"Error accessing subfolder in {path}: {str(err)}"), matcher=matcher, max_depth=2):
                 # Check a few files in each directory
-                for i, file in enumerate(files):
-                    if i >= 3:  # Just check a few files per directory
+                checked = 0
+                for entry in files:
+                    if checked >= 3:  # Just check a few files per directory
                         break
-                    file_path = os.path.join(root, file)
-                    if not os.access(file_path, os.R_OK):
-                        warnings.append(f"No read permission for file in subfolder: {file_path}")
+                    if matcher and matcher['limits']:
+                        st = entry_stat(entry)
+                        if st and match_limits(matcher, st):
+                            continue
+                    checked += 1
+                    if not os.access(entry.path, os.R_OK):
+                        warnings.append(f"No read permission for file in subfolder: {entry.path}")
                         break  # Just report one file per directory
                 
                 # Exit early if we've found several issues
@@ -641,9 +1696,17 @@ def apply_retention_policy():
         
         # Keep the most recent N files as specified by retention_count
         files_to_delete = backup_files[retention_count:]
+
+        # Never delete an archive that a kept delta backup is rebuilt from
+        required = required_delta_bases(destination, [filename for _, filename, _ in backup_files[:retention_count]])
+        if required:
+            kept = [entry for entry in files_to_delete if entry[1] in required]
+            files_to_delete = [entry for entry in files_to_delete if entry[1] not in required]
+            for _, filename, _ in kept:
+                logging.info(f"Retention policy: keeping {filename}, needed as a delta base")
         
         # Log retention policy summary
-        logging.info(f"Retention policy: keeping {retention_count} of {len(backup_files)} backups")
+        logging.info(f"Retention policy: keeping {len(backup_files) - len(files_to_delete)} of {len(backup_files)} backups")
         
         # Delete older files and log the actions
         for filepath, filename, _ in files_to_delete:
@@ -659,6 +1722,8 @@ def apply_retention_policy():
                     backup_config['history'].insert(0, error_msg)
                     logging.error(error_msg)
         
+        if files_to_delete:
+            invalidate_destination_cache()
         save_config()
             
     except Exception as e:
@@ -689,8 +1754,6 @@ def index():
             # Return error - you could flash a message or return directly
             return render_template_string(html_template, 
                                          config=backup_config, 
-                                         destination_files=[], 
-                                         stats=get_stats(), 
                                          backup_warnings=[f"Invalid destination path: {message}"])
                                          
         backup_config['destination'] = dest_path
@@ -699,6 +1762,19 @@ def index():
         backup_config['destination'] = request.form['destination']
         backup_config['webhook_url'] = request.form.get('webhook_url', '').strip()
         backup_config['retention_count'] = int(request.form.get('retention_count', 0))
+        backup_config['prefetch_depth'] = int(request.form.get('prefetch_depth', 16))
+        backup_config['prefetch_max_file_kb'] = int(request.form.get('prefetch_max_file_kb', 1024))
+        backup_config['solid_mode'] = request.form.get('solid_mode', 'false') == 'true'
+        backup_config['solid_block_mb'] = max(1, int(request.form.get('solid_block_mb', 16)))
+        backup_config['solid_max_file_kb'] = max(1, int(request.form.get('solid_max_file_kb', 64)))
+        if request.form.get('solid_compression') in SOLID_COMPRESSION:
+            backup_config['solid_compression'] = request.form['solid_compression']
+        backup_config['delta_mode'] = request.form.get('delta_mode', 'false') == 'true'
+        backup_config['delta_min_mb'] = max(1, int(request.form.get('delta_min_mb', 256)))
+        backup_config['delta_block_kb'] = max(4, int(request.form.get('delta_block_kb', 1024)))
+        backup_config['delta_max_chain'] = min(MAX_DELTA_DEPTH, max(1, int(request.form.get('delta_max_chain', 7))))
+        backup_config['large_file_mb'] = max(1, int(request.form.get('large_file_mb', 64)))
+        backup_config['large_file_buffer_mb'] = max(1, int(request.form.get('large_file_buffer_mb', 8)))
 
         backup_config['ui_state'] = {
             'history_collapsed': request.form.get('history_collapsed', 'false'),
@@ -707,24 +1783,45 @@ def index():
             'stats_collapsed': request.form.get('stats_collapsed', 'false')
         }
 
+        exclude_rules = [rule.strip() for rule in request.form.get('exclude_rules', '').split('\n') if rule.strip()]
+        try:
+            compile_rules(tuple(exclude_rules))
+        except ValueError as e:
+            return render_template_string(html_template, 
+                                         config=backup_config, 
+                                         backup_warnings=[f"Invalid include/exclude rules: {str(e)}"])
+        backup_config['exclude_rules'] = exclude_rules
+
         files_input = request.form['files'].split('\n')
         backup_config['files'] = []
         for line in files_input:
             if not line.strip():
                 continue
                 
-            parts = line.strip().split('|')
-            if len(parts) == 2:
+            # Paths cannot contain '|' (validate_path), so the rules part keeps any of its own
+            parts = line.strip().split('|', 2)
+            if len(parts) in (2, 3):
                 path = parts[0].strip()
                 is_valid, message = validate_path(path)
                 if is_valid:
-                    backup_config['files'].append({'path': path, 'label': parts[1].strip()})
+                    entry = {'path': path, 'label': parts[1].strip()}
+                    if len(parts) == 3:
+                        entry['rules'] = [rule.strip() for rule in parts[2].split(';') if rule.strip()]
+                        try:
+                            get_matcher(entry)
+                        except ValueError as e:
+                            return render_template_string(html_template, 
+                                               config=backup_config, 
+                                               backup_warnings=[f"Invalid rules for file '{path}': {str(e)}"])
+                    backup_config['files'].append(entry)
                 else:
                     return render_template_string(html_template, 
                                                config=backup_config, 
-                                               destination_files=[], 
-                                               stats=get_stats(), 
                                                backup_warnings=[f"Invalid file path '{path}': {message}"])
+            else:
+                return render_template_string(html_template, 
+                                               config=backup_config, 
+                                               backup_warnings=[f"Invalid file entry '{line.strip()}': expected 'path | label' or 'path | label | rules'"])
 
         folders_input = request.form['folders'].split('\n')
         backup_config['folders'] = []
@@ -732,18 +1829,30 @@ def index():
             if not line.strip():
                 continue
                 
-            parts = line.strip().split('|')
-            if len(parts) == 2:
+            # Paths cannot contain '|' (validate_path), so the rules part keeps any of its own
+            parts = line.strip().split('|', 2)
+            if len(parts) in (2, 3):
                 path = parts[0].strip()
                 is_valid, message = validate_path(path)
                 if is_valid:
-                    backup_config['folders'].append({'path': path, 'label': parts[1].strip()})
+                    entry = {'path': path, 'label': parts[1].strip()}
+                    if len(parts) == 3:
+                        entry['rules'] = [rule.strip() for rule in parts[2].split(';') if rule.strip()]
+                        try:
+                            get_matcher(entry)
+                        except ValueError as e:
+                            return render_template_string(html_template, 
+                                            config=backup_config, 
+                                            backup_warnings=[f"Invalid rules for folder '{path}': {str(e)}"])
+                    backup_config['folders'].append(entry)
                 else:
                     return render_template_string(html_template, 
                                             config=backup_config, 
-                                            destination_files=[], 
-                                            stats=get_stats(), 
                                             backup_warnings=[f"Invalid folder path '{path}': {message}"])
+            else:
+                return render_template_string(html_template, 
+                                            config=backup_config, 
+                                            backup_warnings=[f"Invalid folder entry '{line.strip()}': expected 'path | label' or 'path | label | rules'"])
 
         save_config()
         schedule.clear()
@@ -755,19 +1864,115 @@ def index():
             
         return redirect('/')
 
-    try:
-        destination_files = os.listdir(backup_config['destination'])
-    except Exception:
-        destination_files = []
-
-    stats = get_stats()
-    return render_template_string(html_template, config=backup_config, destination_files=destination_files, stats=stats, backup_warnings=backup_config.get('last_warnings', []))
+    # History, stats and destination contents are loaded by the page from /api/v1
+    return render_template_string(html_template, config=backup_config, backup_warnings=backup_config.get('last_warnings', []))
 
 @app.route('/run_backup', methods=['POST'])
 def manual_backup():
     success, warnings = run_backup()
     return redirect('/')
 
+def api_response(payload, etag=None, last_modified=None):
+    """
+    JSON response with ETag (a hash of the payload unless given) and optional
+    Last-Modified, answered with 304 when the client's copy is still current
+    """
+    response = jsonify(payload)
+    response.set_etag(etag or hashlib.md5(response.get_data()).hexdigest())
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def api_error(message, status=400):
+    return jsonify({'error': message}), status
+
+def get_page_args(max_per_page=500):
+    """Read page/per_page query args, returning (page, per_page) or raising ValueError"""
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 50, type=int)
+    if page < 1 or not 1 <= per_page <= max_per_page:
+        raise ValueError(f"page must be >= 1 and per_page between 1 and {max_per_page}")
+    return page, per_page
+
+def paginate(items, page, per_page):
+    pages = max(1, -(-len(items) // per_page))
+    page = min(page, pages)
+    return {
+        'items': items[(page - 1) * per_page:page * per_page],
+        'page': page,
+        'per_page': per_page,
+        'pages': pages,
+        'total': len(items)
+    }
+
+@app.route(f'{API_PREFIX}/config', methods=['GET'])
+def api_config():
+    hidden = ('history', 'stats', 'last_warnings', 'ui_state')
+    return api_response({key: value for key, value in backup_config.items() if key not in hidden})
+
+@app.route(f'{API_PREFIX}/runs', methods=['GET'])
+def api_runs():
+    try:
+        page, per_page = get_page_args()
+    except ValueError as e:
+        return api_error(str(e))
+    payload = paginate(backup_config['history'], page, per_page)
+    payload['last_warnings'] = backup_config.get('last_warnings', [])
+    return api_response(payload)
+
+@app.route(f'{API_PREFIX}/destination', methods=['GET'])
+def api_destination():
+    try:
+        page, per_page = get_page_args()
+    except ValueError as e:
+        return api_error(str(e))
+    sort = request.args.get('sort', 'name')
+    order = request.args.get('order', 'asc')
+    if sort not in ('name', 'size', 'mtime') or order not in ('asc', 'desc'):
+        return api_error("sort must be name, size or mtime and order asc or desc")
+
+    entries, etag, last_modified = list_destination(sort, order)
+    # Page parameters are part of the URL, so one ETag per listing state is enough
+    if request.if_none_match.contains(etag):
+        return api_response({}, etag, last_modified)
+
+    payload = paginate(entries, page, per_page)
+    payload['items'] = [dict(entry, mtime=datetime.fromtimestamp(entry['mtime']).strftime('%Y-%m-%d %H:%M:%S'))
+                        for entry in payload['items']]
+    payload['destination'] = backup_config['destination']
+    return api_response(payload, etag, last_modified)
+
+@app.route(f'{API_PREFIX}/restore', methods=['POST'])
+def api_restore():
+    data = request.get_json(silent=True) or {}
+    archive = data.get('archive', '')
+    member = data.get('member', '')
+    target = data.get('target', '')
+
+    archive_path = os.path.join(backup_config['destination'], archive)
+    if not archive or os.path.basename(archive) != archive or not archive.endswith('.zip') or not os.path.isfile(archive_path):
+        return api_error("archive must be the name of a backup in the destination folder")
+    is_valid, message = validate_path(target)
+    if not is_valid:
+        return api_error(f"Invalid target path: {message}")
+    if os.path.exists(target):
+        return api_error("target already exists", 409)
+
+    try:
+        restore_file(archive_path, member, target)
+    except KeyError:
+        return api_error(f"{member} is not in {archive}", 404)
+    except Exception as e:
+        logging.error(f"Restore of {member} from {archive} failed: {str(e)}\n{traceback.format_exc()}")
+        return api_error(f"Restore failed: {str(e)}", 500)
+    logging.info(f"Restored {member} from {archive} to {target}")
+    return jsonify({'archive': archive, 'member': member, 'target': target})
+
+@app.route(f'{API_PREFIX}/stats', methods=['GET'])
+def api_stats():
+    return api_response({'source': get_cached_stats(), 'backups': backup_config['stats']})
+
 threading.Thread(target=schedule_backups, daemon=True).start()
 
 if __name__ == '__main__':